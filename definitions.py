@@ -1,14 +1,72 @@
+import asyncio
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import datetime
 import os
-from typing import List, Dict, Any
+import mmap
+import numpy as np
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+
+# product_id -> (buy price, sell price, buyMovingWeek, sellMovingWeek)
+BazaarIndex = Dict[str, Tuple[Optional[float], Optional[float], float, float]]
 
 # Ensure necessary directories exist
 DIRECTORIES = ['Bazaar', 'heure', 'benef', 'calculs', 'journalier', 'journalierJS', 'flip']
 for directory in DIRECTORIES:
     os.makedirs(directory, exist_ok=True)
 
+# Shared HTTP session so every call to api.hypixel.net reuses pooled keep-alive connections
+REQUEST_TIMEOUT = 10
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.headers.update({'Accept-Encoding': 'gzip'})
+
+# Seconds between two automation cycles
+AUTOMATION_INTERVAL = 3600
+
+# Flips are stored one per line in data_flip.jsonl; data_flip.js wraps them so index.html can load them with a plain <script> tag
+FLIP_STORE_PATH = os.path.join('flip', 'data_flip.jsonl')
+FLIP_JS_PATH = os.path.join('flip', 'data_flip.js')
+FLIP_JS_PREFIX = b'const data_flips = '
+
+# Rolling per-item aggregates of every completed day in Bazaar/
+AGG_STATE_FILE = 'bazaar_agg_state.json'
+# count, sum_buy, sum_sell, min_buy, max_buy, min_sell, max_sell
+EMPTY_ITEM_STATS = (0.0, 0.0, 0.0, float('inf'), float('-inf'), float('inf'), float('-inf'))
+
+def _write_compact_json(file_path: str, data: Any):
+    """
+    Writes a JSON file that is only ever read back by this tool.
+
+    orjson emits no whitespace (the equivalent of separators=(',', ':')), keeping the many Bazaar snapshots small on disk
+    and fast to decode. Files meant to be read by people or the web page keep their indentation.
+    """
+    with open(file_path, 'wb') as f:
+        f.write(orjson.dumps(data))
+
+def _index_bazaar_products(products: Dict[str, Any]) -> BazaarIndex:
+    """Builds the product lookup from the API's "products" object, reading each quick_status once."""
+    return {
+        product_id: (
+            (quick_status := product_data.get("quick_status") or {}).get("buyPrice"),
+            quick_status.get("sellPrice"),
+            quick_status.get("buyMovingWeek", 0),
+            quick_status.get("sellMovingWeek", 0)
+        )
+        for product_id, product_data in products.items()
+    }
+
+def _bazaar_infos_from_index(bazaar_index: BazaarIndex) -> List[Dict[str, Any]]:
+    """Turns a product lookup into the (id, sell price, buy price) list stored in the Bazaar snapshots."""
+    return [
+        {"product_id": product_id, "sell_price": product[1], "buy_price": product[0]}
+        for product_id, product in bazaar_index.items()
+    ]
+
 def get_bazaar_infos(api_url: str) -> List[Dict[str, Any]]:
     """
     Fetches real-time Bazaar data from the Hypixel API.
@@ -20,21 +78,33 @@ def get_bazaar_infos(api_url: str) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: A list of dictionaries containing product information (id, sell price, buy price).
     """
     try:
-        r = requests.get(api_url)
+        r = _SESSION.get(api_url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
-        product_info_list = []
-        for product_id, product_data in data["products"].items():
-            product_info = {"product_id": product_id}
-            quick_status = product_data.get("quick_status", {})
-            product_info["sell_price"] = quick_status.get("sellPrice", None)
-            product_info["buy_price"] = quick_status.get("buyPrice", None)
-            product_info_list.append(product_info)
-        return product_info_list
-    except requests.exceptions.RequestException as e:
+        return _bazaar_infos_from_index(_index_bazaar_products(orjson.loads(r.content)["products"]))
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error fetching Bazaar info: {e}")
         return []
 
+async def fetch_bazaar_index(session: aiohttp.ClientSession, api_url: str) -> BazaarIndex:
+    """
+    Fetches real-time Bazaar data as a product lookup, for the automation cycle.
+
+    Args:
+        session (aiohttp.ClientSession): The session shared by the automation cycles.
+        api_url (str): The URL of the Bazaar API.
+
+    Returns:
+        BazaarIndex: The product lookup, empty on error.
+    """
+    try:
+        async with session.get(api_url) as r:
+            r.raise_for_status()
+            content = await r.read()
+        return _index_bazaar_products(orjson.loads(content)["products"])
+    except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+        print(f"Error fetching Bazaar info: {e}")
+        return {}
+
 def get_player_infos(api_key: str, uuid: str) -> Dict[str, Any]:
     """
     Fetches player stats/achievements (specifically Skyblock levels) using the Hypixel API.
@@ -48,9 +118,9 @@ def get_player_infos(api_key: str, uuid: str) -> Dict[str, Any]:
     """
     url = f"https://api.hypixel.net/player?key={api_key}&uuid={uuid}"
     try:
-        r = requests.get(url)
+        r = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         if "player" in data and data["player"] is not None:
             achievements = data["player"].get("achievements", {})
             player_info = {
@@ -66,7 +136,7 @@ def get_player_infos(api_key: str, uuid: str) -> Dict[str, Any]:
         else:
             player_info = {}
         return player_info
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error fetching player info: {e}")
         return {}
 
@@ -87,169 +157,271 @@ def print_player_info(player_info: Dict[str, Any]):
 def create_ref_data(api_url: str):
     """Creates the reference data file (bazaar_ref.json)."""
     bazaar_info = get_bazaar_infos(api_url)
-    with open('bazaar_ref.json', 'w') as f:
-        json.dump(bazaar_info, f)
+    _write_compact_json('bazaar_ref.json', bazaar_info)
 
 def create_comp_data(api_url: str):
     """Creates the comparison data file (bazaar_comp.json)."""
     bazaar_info = get_bazaar_infos(api_url)
-    with open('bazaar_comp.json', 'w') as f:
-        json.dump(bazaar_info, f)
+    _write_compact_json('bazaar_comp.json', bazaar_info)
+
+def _load_hourly_file(file_path: str) -> Tuple[List[str], List[float], List[float]]:
+    """
+    Reads one hourly Bazaar snapshot into (product ids, sell prices, buy prices) columns.
+
+    Only the columns are kept, so each decoded snapshot can be freed before the next file is read.
+    A corrupted file yields empty columns.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            bazaar_info = orjson.loads(f.read())
+    except orjson.JSONDecodeError:
+        print(f"Error reading {file_path}")
+        return [], [], []
+    ids = [product['product_id'] for product in bazaar_info]
+    sell = [product.get('sell_price', 0) or 0 for product in bazaar_info] # Handle None
+    buy = [product.get('buy_price', 0) or 0 for product in bazaar_info]   # Handle None
+    return ids, sell, buy
+
+def aggregate_hourly_data(today: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Aggregates all hourly JSON files into a daily summary.
+
+    Args:
+        today (str): The cycle's date (YYYY-MM-DD), used to name the daily file.
 
-def aggregate_hourly_data():
-    """Aggregates all hourly JSON files into a daily summary."""
+    Returns:
+        Optional[List[Dict[str, Any]]]: The daily averages that were written to Bazaar/, or None if there was nothing to aggregate.
+    """
     hourly_dir = 'heure'
     
-    if not os.path.exists(hourly_dir):
+    try:
+        entries = os.scandir(hourly_dir)
+    except FileNotFoundError:
         print(f"Directory '{hourly_dir}' not found.")
         return
 
-    bazaar_files = [f for f in os.listdir(hourly_dir) if f.startswith('bazaar_') and f.endswith('.json')]
-    if not bazaar_files:
+    with entries:
+        file_paths = [e.path for e in entries if e.name.startswith('bazaar_') and e.name.endswith('.json')]
+    if not file_paths:
         print(f"No 'bazaar_{{hour}}.json' files found in '{hourly_dir}'.")
         return
 
-    bazaar_info_total = []
-    for file in bazaar_files:
-        file_path = os.path.join(hourly_dir, file)
-        try:
-            with open(file_path, 'r') as f:
-                bazaar_info = json.load(f)
-                bazaar_info_total.extend(bazaar_info)
-        except json.JSONDecodeError:
-            print(f"Error reading {file_path}")
+    ids_total, sell_total, buy_total = [], [], []
+    for file_path in file_paths:
+        ids, sell, buy = _load_hourly_file(file_path)
+        ids_total.extend(ids)
+        sell_total.extend(sell)
+        buy_total.extend(buy)
 
-    if not bazaar_info_total:
+    if not ids_total:
         print("No Bazaar info found in files.")
         return
 
-    products = {}
-    for product in bazaar_info_total:
-        p_id = product['product_id']
-        sell = product.get('sell_price', 0) or 0 # Handle None
-        buy = product.get('buy_price', 0) or 0   # Handle None
-        
-        if p_id not in products:
-            products[p_id] = {'sell_price': [], 'buy_price': []}
-        products[p_id]['sell_price'].append(sell)
-        products[p_id]['buy_price'].append(buy)
-
-    bazaar_final = []
-    for p_id, prices in products.items():
-        avg_buy = sum(prices['buy_price']) / len(prices['buy_price']) if prices['buy_price'] else 0
-        avg_sell = sum(prices['sell_price']) / len(prices['sell_price']) if prices['sell_price'] else 0
-        bazaar_final.append({'product_id': p_id, 'sell_price': avg_sell, 'buy_price': avg_buy})
-
-    today = datetime.date.today().strftime("%Y-%m-%d")
+    # Group every hourly sample by product id and average each group in one vectorized pass
+    n_samples = len(ids_total)
+    ids = np.array(ids_total)
+    sell = np.array(sell_total, dtype=np.float64)
+    buy = np.array(buy_total, dtype=np.float64)
+
+    order = np.argsort(ids, kind='stable')
+    ids, sell, buy = ids[order], sell[order], buy[order]
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    counts = np.diff(np.r_[starts, n_samples])
+    avg_sell = np.add.reduceat(sell, starts) / counts
+    avg_buy = np.add.reduceat(buy, starts) / counts
+
+    bazaar_final = [
+        {'product_id': p_id, 'sell_price': s_avg, 'buy_price': b_avg}
+        for p_id, s_avg, b_avg in zip(ids[starts].tolist(), avg_sell.tolist(), avg_buy.tolist())
+    ]
+
     final_file_path = os.path.join('Bazaar', f"bazaar_{today}.json")
-    with open(final_file_path, 'w') as f:
-        json.dump(bazaar_final, f)
+    _write_compact_json(final_file_path, bazaar_final)
+    return bazaar_final
+
+def _load_json_mmap(file_path: str) -> Any:
+    """Decodes a JSON file straight from a read-only memory map of it."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _export_prices_txt(json_path: str, txt_path: str):
+    """Writes one "id sell buy" line per product of a Bazaar snapshot, in a single write. Does nothing if the snapshot is missing."""
+    try:
+        bazaar_data = _load_json_mmap(json_path)
+    except FileNotFoundError:
+        return
+    lines = [f"{item['product_id']} {item['sell_price']} {item['buy_price']}\n" for item in bazaar_data]
+    with open(txt_path, 'w') as txt_file:
+        txt_file.write(''.join(lines))
 
 def export_comp_data_txt():
     """Exports comparison data to a text file."""
-    if not os.path.exists('bazaar_comp.json'):
-         return
-    with open('bazaar_comp.json', 'r') as f:
-        bazaar_comp_data = json.load(f)
-    with open('comp_data', 'w') as comp_file:
-        for item in bazaar_comp_data:
-            comp_file.write(f"{item['product_id']} {item['sell_price']} {item['buy_price']}\n")
+    _export_prices_txt('bazaar_comp.json', 'comp_data')
 
 def export_ref_data_txt():
     """Exports reference data to a text file."""
-    if not os.path.exists('bazaar_ref.json'):
-        return
-    with open('bazaar_ref.json', 'r') as f:
-        bazaar_ref_data = json.load(f)
-    with open('ref_data', 'w') as ref_file:
-        for item in bazaar_ref_data:
-            ref_file.write(f"{item['product_id']} {item['sell_price']} {item['buy_price']}\n")
-
-def calculate_daily_profit_averages(): 
-    """Calculates daily averages and identifies profitable items."""
-    today = datetime.date.today().strftime("%Y-%m-%d")
+    _export_prices_txt('bazaar_ref.json', 'ref_data')
+
+def _load_agg_state() -> Dict[str, Any]:
+    """Loads the rolling per-item aggregates of the already completed days."""
+    try:
+        f = open(AGG_STATE_FILE, 'rb')
+    except FileNotFoundError:
+        return {"days": [], "items": {}}
+    with f:
+        try:
+            agg_state = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
+            print(f"Error reading {AGG_STATE_FILE}, rebuilding it.")
+            return {"days": [], "items": {}}
+    agg_state['items'] = {item_id: array('d', stats) for item_id, stats in agg_state['items'].items()}
+    return agg_state
+
+def _save_agg_state(agg_state: Dict[str, Any]):
+    """Persists the rolling per-item aggregates."""
+    items = {item_id: stats.tolist() for item_id, stats in agg_state['items'].items()}
+    _write_compact_json(AGG_STATE_FILE, {"days": agg_state['days'], "items": items})
+
+def _fold_daily_data(stats_per_item: Dict[str, array], data: List[Dict[str, Any]]):
+    """
+    Folds one day of Bazaar averages into the running per-item aggregates.
+
+    Each item maps to array('d', [count, sum_buy, sum_sell, min_buy, max_buy, min_sell, max_sell]).
+    """
+    for item in data:
+        item_id = item['product_id']
+        buy_price = item.get('buy_price', 0) or 0
+        sell_price = item.get('sell_price', 0) or 0
+
+        stats = stats_per_item.get(item_id)
+        if stats is None:
+            stats = stats_per_item[item_id] = array('d', EMPTY_ITEM_STATS)
+        stats[0] += 1
+        stats[1] += buy_price
+        stats[2] += sell_price
+        stats[3] = min(stats[3], buy_price)
+        stats[4] = max(stats[4], buy_price)
+        stats[5] = min(stats[5], sell_price)
+        stats[6] = max(stats[6], sell_price)
+
+def calculate_daily_profit_averages(today: str, today_data: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Calculates daily averages and identifies profitable items.
+
+    Args:
+        today (str): The cycle's date (YYYY-MM-DD).
+        today_data (Optional[List[Dict[str, Any]]]): Today's daily averages if already in memory, otherwise they are read from Bazaar/.
+
+    Returns:
+        Optional[Dict[str, Any]]: The summary written to calculs/, or None if Bazaar/ does not exist.
+    """
     bazaar_dir = 'Bazaar'
     
-    if not os.path.exists(bazaar_dir):
+    try:
+        entries = os.scandir(bazaar_dir)
+    except FileNotFoundError:
         return
 
-    bazaar_files = [f for f in os.listdir(bazaar_dir) if f.startswith('bazaar_') and f.endswith('.json')]
-    stats_per_item = {}
-
-    for file in bazaar_files:
-        with open(os.path.join(bazaar_dir, file), 'r') as f:
-            data = json.load(f)
-            for item in data:
-                item_id = item['product_id']
-                buy_price = item.get('buy_price', 0) or 0
-                sell_price = item.get('sell_price', 0) or 0
-                
-                if item_id not in stats_per_item:
-                    stats_per_item[item_id] = {'buy_price': [], 'sell_price': []}
-                stats_per_item[item_id]['buy_price'].append(buy_price)
-                stats_per_item[item_id]['sell_price'].append(sell_price)
+    with entries:
+        bazaar_files = sorted((e.name, e.path) for e in entries if e.name.startswith('bazaar_') and e.name.endswith('.json'))
+
+    # Past days never change once over, so they are folded into the persisted state only once
+    agg_state = _load_agg_state()
+    folded_days = set(agg_state['days'])
+    state_changed = False
+
+    prefix_len, suffix_len = len('bazaar_'), len('.json')
+    for file, file_path in bazaar_files:
+        day = file[prefix_len:-suffix_len]
+        if day in folded_days or (day == today and today_data is not None):
+            continue
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
+        if day == today:
+            today_data = data
+            continue
+        _fold_daily_data(agg_state['items'], data)
+        agg_state['days'].append(day)
+        state_changed = True
+
+    if state_changed:
+        _save_agg_state(agg_state)
+
+    # Today's file is rewritten every hour, so it is only combined in memory
+    stats_per_item = {item_id: array('d', stats) for item_id, stats in agg_state['items'].items()}
+    _fold_daily_data(stats_per_item, today_data or [])
 
     benef_dir = 'benef'
     benef_file_path = os.path.join(benef_dir, f'items_en_benef_{today}.txt')
     # Clear previous file content if needed, or append. Here assuming append as in original.
 
-    for item_id, stats in stats_per_item.items():
-        if not stats['buy_price'] or not stats['sell_price']:
-            continue
-            
-        avg_buy = sum(stats['buy_price']) / len(stats['buy_price'])
-        avg_sell = sum(stats['sell_price']) / len(stats['sell_price'])
-        profit = avg_sell - avg_buy
-        
-        if profit > 0 and avg_buy != 0:
-            with open(benef_file_path, 'a') as f:
-                f.write(f"Profit of: {profit:.2f} on: {item_id}\n")
-
     data_json = {
         "date": today,
         "items": []
     }
-    
+
+    # One pass computes each average once and feeds both the benef file and the JSON summary
+    benef_lines = []
+    add_benef_line = benef_lines.append
+    add_item = data_json["items"].append
     for item_id, stats in stats_per_item.items():
-        if not stats['buy_price'] or not stats['sell_price']:
-            continue
+        avg_buy = stats[1] / stats[0]
+        avg_sell = stats[2] / stats[0]
+        profit = avg_sell - avg_buy
 
-        avg_buy = sum(stats['buy_price']) / len(stats['buy_price'])
-        avg_sell = sum(stats['sell_price']) / len(stats['sell_price'])
-        
-        data_json["items"].append({
+        if profit > 0 and avg_buy != 0:
+            add_benef_line(f"Profit of: {profit:.2f} on: {item_id}\n")
+
+        add_item({
             "item_id": item_id,
             "avg_buy": avg_buy,
             "avg_sell": avg_sell,
-            "max_buy": max(stats['buy_price']),
-            "min_buy": min(stats['buy_price']),
-            "max_sell": max(stats['sell_price']),
-            "min_sell": min(stats['sell_price']),
-            "profit": avg_sell - avg_buy
+            "max_buy": stats[4],
+            "min_buy": stats[3],
+            "max_sell": stats[6],
+            "min_sell": stats[5],
+            "profit": profit
         })
 
+    # Single append instead of reopening the file for every profitable item
+    if benef_lines:
+        with open(benef_file_path, 'a') as f:
+            f.write(''.join(benef_lines))
+
     output_dir = 'calculs'
     with open(os.path.join(output_dir, f'calculs_benefs_moyenne_{today}.json'), 'w') as json_file:
-        json.dump(data_json, json_file, indent=4)
+        json_file.write(json.dumps(data_json, indent=4))
+    return data_json
 
-def compare_buy_sell_prices():
-    """Compares current buy prices with average sell prices to find flip opportunities."""
-    today = datetime.date.today().strftime("%Y-%m-%d")
+def compare_buy_sell_prices(today: str, bazaar_data: Optional[List[Dict[str, Any]]] = None, calc_data: Optional[Dict[str, Any]] = None):
+    """
+    Compares current buy prices with average sell prices to find flip opportunities.
+
+    Args:
+        today (str): The cycle's date (YYYY-MM-DD).
+        bazaar_data (Optional[List[Dict[str, Any]]]): Today's daily averages, read from Bazaar/ when not given.
+        calc_data (Optional[Dict[str, Any]]): Today's profit summary, read from calculs/ when not given.
+    """
     bazaar_file = os.path.join('Bazaar', f'bazaar_{today}.json')
     calc_file = os.path.join('calculs', f'calculs_benefs_moyenne_{today}.json')
 
-    if not os.path.exists(bazaar_file) or not os.path.exists(calc_file):
+    try:
+        if bazaar_data is None:
+            with open(bazaar_file, 'rb') as f:
+                bazaar_data = orjson.loads(f.read())
+        if calc_data is None:
+            with open(calc_file, 'rb') as f:
+                calc_data = orjson.loads(f.read())
+    except FileNotFoundError:
         print(f"Missing data files for {today}.")
         return
-    
-    with open(bazaar_file, 'r') as f:
-        bazaar_data = json.load(f)
-        buy_prices = {item["product_id"]: item.get("buy_price", 0) for item in bazaar_data}
 
-    with open(calc_file, 'r') as f:
-        calc_data = json.load(f)
-        # Handle key mismatch if json structure changed. Assuming 'items' key exists
-        sell_prices = {item["item_id"]: item.get("avg_sell", 0) for item in calc_data.get("items", [])}
+    buy_prices = {item["product_id"]: item.get("buy_price", 0) for item in bazaar_data}
+    # Handle key mismatch if json structure changed. Assuming 'items' key exists
+    sell_prices = {item["item_id"]: item.get("avg_sell", 0) for item in calc_data.get("items", [])}
 
     profitable_items = []
     for item_id, buy_price in buy_prices.items():
@@ -272,61 +444,139 @@ def compare_buy_sell_prices():
     
     print(f"JS data saved to: {js_file_path}")
 
-def update_flip_data(api_url: str):
-    """Updates the flip data JS file with moving week info."""
+def _load_flip_js() -> List[Dict[str, Any]]:
+    """Reads the flips out of flip/data_flip.js, where they are added by hand."""
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()
-        bazaar_data = response.json()
-    except Exception as e:
-        print(f"Error updating flip data: {e}")
+        f = open(FLIP_JS_PATH, 'rb')
+    except FileNotFoundError:
+        return []
+    with f:
+        content = f.read().strip()
+    if not content.startswith(FLIP_JS_PREFIX):
+        return []
+    # Decode the JSON between the JS prefix and the trailing ';' without copying it
+    end = -1 if content.endswith(b';') else len(content)
+    try:
+        return orjson.loads(memoryview(content)[len(FLIP_JS_PREFIX):end]).get('flips', [])
+    except orjson.JSONDecodeError:
+        return []
+
+def _load_flip_store() -> Optional[List[Dict[str, Any]]]:
+    """
+    Loads the flips from flip/data_flip.jsonl.
+
+    Returns None when the store does not exist yet or flip/data_flip.js was modified after it was written,
+    in which case the flips must be read from flip/data_flip.js instead.
+    """
+    try:
+        f = open(FLIP_STORE_PATH, 'rb')
+    except FileNotFoundError:
+        return None
+
+    flips = []
+    with f:
+        try:
+            if os.path.getmtime(FLIP_JS_PATH) > os.fstat(f.fileno()).st_mtime:
+                return None
+        except FileNotFoundError:
+            pass
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                flips.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                print(f"Skipping corrupted line in {FLIP_STORE_PATH}")
+    return flips
+
+def _save_flip_store(flips: List[Dict[str, Any]]):
+    """Rewrites flip/data_flip.jsonl, one flip per line."""
+    with open(FLIP_STORE_PATH, 'wb') as f:
+        f.write(b''.join(orjson.dumps(flip_item) + b'\n' for flip_item in flips))
+
+def _write_flip_js(flips: List[Dict[str, Any]]):
+    """Regenerates flip/data_flip.js, the file loaded by index.html."""
+    with open(FLIP_JS_PATH, 'wb') as f:
+        f.write(FLIP_JS_PREFIX)
+        f.write(orjson.dumps({"flips": flips}, option=orjson.OPT_INDENT_2))
+        f.write(b';')
+
+def update_flip_data(bazaar_index: BazaarIndex):
+    """
+    Updates the flips' moving week info in the flip store and flip/data_flip.js.
+
+    Flips added to flip/data_flip.js by hand are picked up on the next call, since the store is re-seeded
+    from it whenever it is newer. Otherwise both files are only rewritten when a moving week value changed.
+
+    Args:
+        bazaar_index (BazaarIndex): Product lookup fetched this cycle.
+    """
+    if not bazaar_index:
+        print("Error updating flip data: no Bazaar data available.")
         return
 
-    flip_file_path = os.path.join('flip', 'data_flip.js')
-    
-    # Load existing
-    flips = {"flips": []}
-    if os.path.exists(flip_file_path) and os.path.getsize(flip_file_path) > 0:
-        with open(flip_file_path, 'r') as f:
-            content = f.read().strip()
-            if content.startswith('const data_flips = '):
-                json_content = content[len('const data_flips = '):].strip().rstrip(';')
-                try:
-                    flips = json.loads(json_content)
-                except json.JSONDecodeError:
-                    pass
+    flips = _load_flip_store()
+    reseeded = flips is None
+    if reseeded:
+        flips = _load_flip_js()
 
     # Update
-    for flip_item in flips['flips']:
-        p_id = flip_item['product_id']
-        if p_id in bazaar_data['products']:
-            qs = bazaar_data['products'][p_id]['quick_status']
-            flip_item['buyMovingWeek'] = qs.get('buyMovingWeek', 0)
-            flip_item['sellMovingWeek'] = qs.get('sellMovingWeek', 0)
-
-    # Save
-    with open(flip_file_path, 'w') as f:
-        f.write('const data_flips = ')
-        json.dump(flips, f, indent=4)
-        f.write(';')
-    
-    print(f"Flip data updated in {flip_file_path}")
-
-def record_hourly_data(api_url: str):
-    """Records the current Bazaar data into an hourly JSON file."""
-    current_hour = datetime.datetime.now().strftime("%H")
+    changed = False
+    for flip_item in flips:
+        product = bazaar_index.get(flip_item['product_id'])
+        if product is None:
+            continue
+        if flip_item.get('buyMovingWeek') != product[2] or flip_item.get('sellMovingWeek') != product[3]:
+            flip_item['buyMovingWeek'] = product[2]
+            flip_item['sellMovingWeek'] = product[3]
+            changed = True
+
+    # Save; the store is written last so it is never older than data_flip.js after our own writes
+    if changed or reseeded or not os.path.exists(FLIP_JS_PATH):
+        _write_flip_js(flips)
+        _save_flip_store(flips)
+        print(f"Flip data updated in {FLIP_JS_PATH}")
+    else:
+        print("Flip data unchanged.")
+
+def record_hourly_data(bazaar_index: BazaarIndex, current_hour: str):
+    """Records the (id, sell price, buy price) of the current Bazaar data into the hourly JSON file of `current_hour` (HH)."""
     filename = f"bazaar_{current_hour}.json"
-    bazaar_info = get_bazaar_infos(api_url)
     
     file_path = os.path.join('heure', filename)
-    with open(file_path, 'w') as f:
-        json.dump(bazaar_info, f)
+    _write_compact_json(file_path, _bazaar_infos_from_index(bazaar_index))
+
+def daily_pipeline(today: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Aggregates the hourly data, then computes the daily averages and flip opportunities from it in memory.
 
-def run_automation_cycle(api_url: str, days_running: int):
+    The daily summary is only written to disk once, instead of being re-read and re-decoded by each step.
+    """
+    bazaar_final = aggregate_hourly_data(today) # Originally recup_data_comp_auto logic roughly
+    calc_data = calculate_daily_profit_averages(today, bazaar_final)
+    compare_buy_sell_prices(today, bazaar_final, calc_data)
+    return bazaar_final
+
+async def run_automation_cycle(session: aiohttp.ClientSession, api_url: str, days_running: int):
     """Runs the full automation cycle."""
-    aggregate_hourly_data() # Originally recup_data_comp_auto logic roughly
-    record_hourly_data(api_url)
-    calculate_daily_profit_averages()
-    compare_buy_sell_prices()
-    update_flip_data(api_url)
+    # Every step works on the same date and hour, even if the cycle crosses midnight
+    now = datetime.datetime.now()
+    today = now.date().isoformat()
+    loop = asyncio.get_running_loop()
+    # The daily steps' disk work overlaps the API request; the new hour is only recorded once they are done
+    # since aggregate_hourly_data reads heure/
+    bazaar_index, _ = await asyncio.gather(
+        fetch_bazaar_index(session, api_url),
+        loop.run_in_executor(None, daily_pipeline, today)
+    )
+    record_hourly_data(bazaar_index, now.strftime("%H"))
+    update_flip_data(bazaar_index)
     print(f"Running for {days_running + 1} days.\n")
+
+async def run_automation(api_url: str, days_running: int, interval: float = AUTOMATION_INTERVAL):
+    """Runs the automation cycle every `interval` seconds until cancelled."""
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        while True:
+            await asyncio.sleep(interval)
+            await run_automation_cycle(session, api_url, days_running)
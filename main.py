@@ -1,6 +1,9 @@
 import os
 import time
-import schedule
+import json
+import atexit
+import asyncio
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 from mojang import API
 # Import everything from definitions.py (ensure it's in the same directory)
@@ -11,7 +14,7 @@ from definitions import (
     export_ref_data_txt,
     create_comp_data,
     export_comp_data_txt,
-    run_automation_cycle
+    run_automation
 )
 
 # Load environment variables
@@ -20,14 +23,59 @@ load_dotenv()
 API_KEY = os.getenv("HYPIXEL_API_KEY")
 BAZAAR_API_URL = "https://api.hypixel.net/v2/skyblock/bazaar"
 
-def get_uuid(username: str) -> str:
-    """Wrapper to get UUID using mojang API."""
+UUID_CACHE_FILE = "uuid_cache.json"
+# Usernames can be changed and then claimed by another account, so cached lookups expire after a day
+UUID_CACHE_TTL = 24 * 60 * 60
+
+def _load_uuid_cache() -> Dict[str, List]:
+    """Loads the username -> [UUID, lookup timestamp] entries saved by previous runs."""
+    try:
+        with open(UUID_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+# Keyed by lowercased username, since Minecraft usernames are case-insensitive
+_uuid_cache = _load_uuid_cache()
+_uuid_cache_changed = False
+
+@atexit.register
+def _save_uuid_cache():
+    """Persists the UUID lookups at exit if any were made or dropped."""
+    if _uuid_cache_changed:
+        with open(UUID_CACHE_FILE, 'w') as f:
+            f.write(json.dumps(_uuid_cache))
+
+def _fresh_cached_uuid(entry: Any) -> Optional[str]:
+    """Returns the UUID of a cache entry, or None if it expired or isn't a [UUID, timestamp] pair."""
+    if not isinstance(entry, list) or len(entry) != 2:
+        return None
+    uuid, fetched_at = entry
+    if not isinstance(uuid, str) or not isinstance(fetched_at, (int, float)):
+        return None
+    return uuid if time.time() - fetched_at < UUID_CACHE_TTL else None
+
+def get_uuid(username: str) -> Optional[str]:
+    """Wrapper to get UUID using mojang API, reusing recent lookups cached across runs."""
+    global _uuid_cache_changed
+    key = username.lower()
+    cached = _fresh_cached_uuid(_uuid_cache.get(key))
+    if cached:
+        return cached
     try:
         mojang_api = API()
-        return mojang_api.get_uuid(username)
+        uuid = mojang_api.get_uuid(username)
     except Exception as e:
         print(f"Error fetching UUID: {e}")
         return None
+    # Unknown players aren't cached, and a name that is no longer in use is dropped
+    if uuid:
+        _uuid_cache[key] = [uuid, time.time()]
+        _uuid_cache_changed = True
+    elif _uuid_cache.pop(key, None) is not None:
+        _uuid_cache_changed = True
+    return uuid
 
 def main():
     if not API_KEY:
@@ -35,11 +83,9 @@ def main():
         print("Please create a .env file based on .env.example and add your API Key.")
         # We can continue for features that don't strictly need it if any, but most do.
     
-    # Schedule the automation
     # Note: 'days_running' logic needs state management if we want it perfect, 
     # but for now using a simple global or passing 0 is fine as per original logic.
     days_running = 0 
-    schedule.every(1).hours.do(run_automation_cycle, api_url=BAZAAR_API_URL, days_running=days_running)
 
     print("=== Hypixel Skyblock Tool ===")
     
@@ -92,9 +138,7 @@ def main():
         elif mode == "A":
             print("Automatic mode started. Press Ctrl+C to stop.")
             try:
-                while True:
-                    schedule.run_pending()
-                    time.sleep(1)
+                asyncio.run(run_automation(BAZAAR_API_URL, days_running))
             except KeyboardInterrupt:
                 print("\nStopping automatic mode.")
 